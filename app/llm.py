@@ -68,10 +68,11 @@ def save_chat_history(chat):
         f.write(json_history)
 
 def load_chat_history():
-    if not os.path.exists(CHAT_HISTORY_FILE):
-        return client.chats.create(model=MODEL, config=chat_config)
-    
-    if os.path.getsize(CHAT_HISTORY_FILE) == 0:
+    # Satu kali os.stat untuk mengecek file ada sekaligus tidak kosong
+    try:
+        if os.stat(CHAT_HISTORY_FILE).st_size == 0:
+            return client.chats.create(model=MODEL, config=chat_config)
+    except FileNotFoundError:
         return client.chats.create(model=MODEL, config=chat_config)
 
     with open(CHAT_HISTORY_FILE, "r", encoding="utf-8") as f:
@@ -1,10 +1,12 @@
 import os
+import zlib
 import logging
 import tempfile
 import shutil
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request
+from fastapi import FastAPI, HTTPException, Form, Request
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # Import fungsi dari modul lain
 from app.stt import transcribe_speech_to_text
@@ -56,25 +58,112 @@ async def root():
     return {"message": "Voice Chatbot API sedang berjalan. Gunakan endpoint /voice-chat untuk berinteraksi."}
 
 
-@app.post("/voice-chat")
-async def voice_chat(file: UploadFile = File(...)):
+# Ekstensi file untuk upload raw body berdasarkan Content-Type
+AUDIO_EXTENSIONS = {
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/mpeg": ".mp3",
+    "audio/ogg": ".ogg",
+}
+
+# Batas ukuran audio setelah dekompresi gzip, untuk menolak gzip bomb
+MAX_AUDIO_BYTES = 50 * 1024 * 1024
+
+
+def decompress_gzip(data: bytes) -> bytes:
+    """
+    Dekompresi data gzip dengan batas ukuran hasil MAX_AUDIO_BYTES.
+    Args:
+        data (bytes): Data terkompresi gzip
+    Returns:
+        bytes: Data hasil dekompresi
+    """
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        result = decompressor.decompress(data, MAX_AUDIO_BYTES)
+    except zlib.error as e:
+        raise HTTPException(
+            status_code=400, detail=f"Data gzip tidak valid: {str(e)}")
+
+    if not decompressor.eof:
+        if len(result) >= MAX_AUDIO_BYTES:
+            raise HTTPException(
+                status_code=413, detail="Ukuran audio setelah dekompresi melebihi batas")
+        raise HTTPException(
+            status_code=400, detail="Data gzip tidak valid: data terpotong")
+    return result
+
+
+# Skema body request untuk dokumentasi OpenAPI, karena endpoint membaca Request langsung
+VOICE_CHAT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            media_type: {"schema": {"type": "string", "format": "binary"}}
+            for media_type in AUDIO_EXTENSIONS
+        } | {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+@app.post("/voice-chat", openapi_extra=VOICE_CHAT_REQUEST_BODY)
+async def voice_chat(request: Request):
     """
     Endpoint utama untuk interaksi voice chat.
 
+    Body request berupa audio mentah (misalnya Content-Type: audio/wav), boleh dikompresi
+    dengan Content-Encoding: gzip. Upload multipart dengan field 'file' tetap didukung,
+    termasuk file gzip dengan akhiran .gz pada nama file.
+
     Args:
-        file: File audio yang diupload dari pengguna (Gradio menggunakan nama 'file' sebagai default)
+        request: Request HTTP yang berisi audio dari pengguna
 
     Returns:
         FileResponse: File audio dengan respons dari chatbot
     """
-    logger.info(f"Menerima permintaan voice chat dengan file: {file.filename}")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    logger.info(f"Menerima permintaan voice chat dengan Content-Type: {content_type}")
 
     try:
-        # Baca konten file audio
-        audio_content = await file.read()
+        if content_type == "multipart/form-data":
+            # Baca konten file audio dari form (field 'file')
+            try:
+                form = await request.form()
+            except StarletteHTTPException as e:
+                raise HTTPException(status_code=400, detail=e.detail)
+            except Exception as e:
+                logger.error(f"Gagal membaca body multipart: {str(e)}")
+                raise HTTPException(
+                    status_code=400, detail="There was an error parsing the body")
+            file = form.get("file")
+            if file is None or isinstance(file, str):
+                raise HTTPException(
+                    status_code=400, detail="Field 'file' tidak ditemukan pada form")
+            audio_content = await file.read()
+            filename = file.filename
+        else:
+            # Baca konten audio langsung dari body request
+            audio_content = await request.body()
+            filename = f"input{AUDIO_EXTENSIONS.get(content_type, '.wav')}"
+            if request.headers.get("content-encoding", "").lower() == "gzip":
+                filename += ".gz"
+
+        # Dekompresi file audio jika dikirim dalam bentuk gzip (.gz)
+        if filename.endswith(".gz"):
+            audio_content = decompress_gzip(audio_content)
+            filename = filename[:-len(".gz")]
+            logger.info(f"File audio didekompresi: {len(audio_content)} bytes")
 
         # Dapatkan ekstensi file dari nama file, defaultnya .wav jika tidak ada ekstensi
-        file_ext = os.path.splitext(file.filename)[1]
+        file_ext = os.path.splitext(filename)[1]
         if not file_ext:
             file_ext = ".wav"  # Default extension jika tidak ada
         logger.info(f"Ekstensi file: {file_ext}")
@@ -124,6 +213,9 @@ async def voice_chat(file: UploadFile = File(...)):
             filename="response.wav"
         )
 
+    except StarletteHTTPException:
+        raise
+
     except Exception as e:
         logger.error(
             f"Terjadi kesalahan saat memproses permintaan voice chat: {str(e)}", exc_info=True)
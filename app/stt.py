@@ -1,5 +1,4 @@
 import os
-import uuid
 import tempfile
 import subprocess
 
@@ -24,11 +23,11 @@ def transcribe_speech_to_text(file_bytes: bytes, file_ext: str = ".wav") -> str:
         str: Teks hasil transkripsi
     """
     with tempfile.TemporaryDirectory() as tmpdir:
-        audio_path = os.path.join(tmpdir, f"{uuid.uuid4()}{file_ext}")
         result_path = os.path.join(tmpdir, "transcription.txt")
 
-        # Simpan audio ke file temporer
-        with open(audio_path, "wb") as f:
+        # Simpan audio ke file temporer langsung lewat fd dari mkstemp
+        fd, audio_path = tempfile.mkstemp(suffix=file_ext, dir=tmpdir)
+        with os.fdopen(fd, "wb") as f:
             f.write(file_bytes)
 
         # Jalankan whisper.cpp dengan subprocess
@@ -20,6 +20,9 @@ COQUI_CONFIG_PATH = os.path.join(COQUI_DIR, "config.json")
 # Pilih nama speaker yang sesuai dengan isi file speakers.pth (misalnya: "wibowo")
 COQUI_SPEAKER = "wibowo"
 
+# Direktori temporer di-cache sekali saat import
+TMP_DIR = tempfile.gettempdir()
+
 
 def transcribe_text_to_speech(text: str) -> str:
     """
@@ -36,8 +39,7 @@ def transcribe_text_to_speech(text: str) -> str:
 
 
 def _tts_with_coqui(text: str) -> str:
-    tmp_dir = tempfile.gettempdir()
-    output_path = os.path.join(tmp_dir, f"tts_{uuid.uuid4()}.wav")
+    output_path = os.path.join(TMP_DIR, f"tts_{uuid.uuid4()}.wav")
 
     # jalankan Coqui TTS dengan subprocess
     cmd = [
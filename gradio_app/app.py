@@ -1,9 +1,11 @@
-import os
-import tempfile
-import requests
+import asyncio
+import concurrent.futures
+import gzip
+import io
+import struct
+import httpx
+import numpy as np
 import gradio as gr
-import scipy.io.wavfile
-import time
 import logging
 from datetime import datetime
 
@@ -15,120 +17,181 @@ logger = logging.getLogger('voice_chatbot_frontend')
 API_URL = "http://localhost:8000/voice-chat"
 REQUEST_TIMEOUT = 300  # Timeout in seconds
 
+# Shared async HTTP client so connections to the backend are kept alive and
+# reused, and concurrent users don't block each other while waiting
+ASYNC_CLIENT = httpx.AsyncClient(
+    timeout=REQUEST_TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+)
+
+# Worker pool for the CPU-bound encode/decode steps so they overlap with the
+# network I/O of other concurrent requests
+CONCURRENCY_LIMIT = 8
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=CONCURRENCY_LIMIT)
+
+# soundfile (libsndfile) is imported on first use to keep frontend startup fast
+
+
+def _soundfile():
+    soundfile = getattr(_soundfile, "module", None)
+    if soundfile is None:
+        import soundfile
+        _soundfile.module = soundfile
+    return soundfile
+
+
+# Fixed 44-byte RIFF header for 16-bit PCM WAV
+_WAV_HDR = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+def _encode_wav(sr, audio_data):
+    # 16-bit PCM: the header followed directly by the raw samples
+    pcm = audio_data.astype('<i2', copy=False).tobytes()
+    nch = 1 if audio_data.ndim == 1 else audio_data.shape[1]
+    nbytes = len(pcm)
+    return _WAV_HDR.pack(b'RIFF', 36 + nbytes, b'WAVE', b'fmt ', 16, 1,
+                         nch, sr, sr * nch * 2, nch * 2, 16,
+                         b'data', nbytes) + pcm
+
+
+def _to_int16(audio_data):
+    # Rescale integer PCM of any width to int16 by shifting the bit-width difference
+    kind, bits = audio_data.dtype.kind, audio_data.dtype.itemsize * 8
+    if kind == 'i' and bits == 16:
+        return audio_data
+    if bits > 16:
+        audio_data = audio_data >> (bits - 16)
+    audio_data = audio_data.astype(np.int32)
+    if bits < 16:
+        audio_data <<= 16 - bits
+    if kind == 'u':
+        audio_data -= 32768
+    return audio_data.astype(np.int16)
+
+
+def _prepare_upload(sr, audio_data):
+    # Quantize float input to int16 to halve the upload size
+    if audio_data.dtype.kind == 'f':
+        audio_data = np.clip(audio_data, -1, 1)
+        audio_data = (audio_data * 32767).astype(np.int16)
+    elif audio_data.dtype.kind in 'iu':
+        audio_data = _to_int16(audio_data)
+    else:
+        raise ValueError(f"Tipe data audio tidak didukung: {audio_data.dtype}")
+
+    wav_bytes = _encode_wav(sr, audio_data)
+
+    # Gzip the payload to cut upload size; sent with Content-Encoding: gzip
+    gz_bytes = gzip.compress(wav_bytes, compresslevel=1)
+    return len(wav_bytes), gz_bytes
+
+
+def _decode_wav(content):
+    data, sr = _soundfile().read(io.BytesIO(content), dtype='int16')
+    return sr, data
+
 # Voice chat function with improved error handling
 
 
-def voice_chat(audio, progress=gr.Progress()):
+async def voice_chat(audio, progress=gr.Progress()):
     if audio is None:
         return None, "⚠️ Mohon rekam suara terlebih dahulu"
 
     # Update timestamp
     timestamp = datetime.now().strftime("%H:%M:%S")
-    logger.info(f"Processing voice request at {timestamp}")
+    logger.info("Processing voice request at %s", timestamp)
 
-    # Add progress updates
+    # Only report start and finish; intermediate updates cost a frame each
     progress(0, desc="Memproses suara...")
 
     try:
         sr, audio_data = audio
 
         # Log audio details for debugging
-        logger.info(f"Audio sample rate: {sr}, shape: {audio_data.shape}")
-
-        # Save as .wav with unique filename
-        audio_filename = f"input_{int(time.time())}.wav"
-        audio_path = os.path.join(tempfile.gettempdir(), audio_filename)
+        logger.info("Audio sample rate: %s, shape: %s", sr, audio_data.shape)
 
-        scipy.io.wavfile.write(audio_path, sr, audio_data)
-        logger.info(f"Saved input audio to: {audio_path}")
-
-        if not os.path.exists(audio_path):
-            logger.error(f"Failed to save audio file at {audio_path}")
-            return None, "⚠️ Gagal menyimpan file audio"
-
-        progress(0.3, desc="Mengirim ke server...")
+        loop = asyncio.get_running_loop()
+        # Encode as .wav in memory
+        wav_size, gz_bytes = await loop.run_in_executor(
+            EXECUTOR, _prepare_upload, sr, audio_data)
+        logger.info("Encoded input audio: %d bytes, %d bytes compressed",
+                    wav_size, len(gz_bytes))
 
         # Send to FastAPI endpoint with timeout
         try:
-            logger.info(f"Sending request to {API_URL}")
-            with open(audio_path, "rb") as f:
-                files = {"file": (audio_filename, f, "audio/wav")}
-                response = requests.post(
-                    API_URL,
-                    files=files,
-                    timeout=REQUEST_TIMEOUT
-                )
-
-            logger.info(
-                f"Response status: {response.status_code}, Content length: {len(response.content) if response.content else 0}")
-
-        except requests.exceptions.Timeout:
+            logger.info("Sending request to %s", API_URL)
+            # Send the WAV as the raw body instead of multipart/form-data
+            response = await ASYNC_CLIENT.post(
+                API_URL,
+                content=gz_bytes,
+                headers={"Content-Type": "audio/wav",
+                         "Content-Encoding": "gzip"}
+            )
+
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Response status: %d, Content length: %d",
+                            response.status_code, len(response.content))
+
+        except httpx.TimeoutException:
             logger.error("Request timed out")
             error_msg = "🕒 Waktu permintaan habis. Server membutuhkan waktu terlalu lama untuk merespons."
             return None, error_msg
 
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             logger.error("Connection error")
             error_msg = "🔌 Tidak dapat terhubung ke server. Pastikan server berjalan di http://localhost:8000"
             return None, error_msg
 
         except Exception as e:
-            logger.error(f"Request error: {str(e)}")
+            logger.error("Request error: %s", e)
             error_msg = f"🔴 Error: {str(e)}"
             return None, error_msg
 
-        progress(0.7, desc="Mendapatkan balasan...")
-
         if response.status_code == 200:
             logger.info("Request successful, processing response")
 
             # Verify content type and length
             content_type = response.headers.get('Content-Type', '')
-            logger.info(f"Response Content-Type: {content_type}")
+            logger.info("Response Content-Type: %s", content_type)
 
             if not response.content:
                 logger.error("Response content is empty")
                 error_msg = "⚠️ Server mengembalikan respons kosong"
                 return None, error_msg
 
-            # Save response audio with unique timestamp to avoid caching issues
-            output_audio_path = os.path.join(
-                tempfile.gettempdir(), f"tts_output_{int(time.time())}.wav")
-
+            # Decode response audio in memory so Gradio can play it directly
             try:
-                with open(output_audio_path, "wb") as f:
-                    f.write(response.content)
-                logger.info(f"Saved response audio to: {output_audio_path}")
-
-                # Verify if file exists and has content
-                if not os.path.exists(output_audio_path) or os.path.getsize(output_audio_path) == 0:
-                    logger.error(
-                        f"Output file doesn't exist or is empty: {output_audio_path}")
-                    error_msg = "⚠️ File audio respons kosong atau tidak valid"
-                    return None, error_msg
+                output_sr, output_data = await loop.run_in_executor(
+                    EXECUTOR, _decode_wav, response.content)
+                logger.info("Decoded response audio: sample rate %s, shape %s",
+                            output_sr, output_data.shape)
 
             except Exception as e:
-                logger.error(f"Failed to save response audio: {e}")
-                error_msg = f"⚠️ Gagal menyimpan file audio respons: {str(e)}"
+                logger.error("Failed to decode response audio: %s", e)
+                error_msg = f"⚠️ Gagal membaca file audio respons: {str(e)}"
                 return None, error_msg
 
             progress(1.0, desc="Selesai!")
-            return output_audio_path, "✅ Berhasil mendapatkan respons"
+            return (output_sr, output_data), "✅ Berhasil mendapatkan respons"
         else:
-            logger.error(
-                f"Server returned error status: {response.status_code}")
+            logger.error("Server returned error status: %d",
+                         response.status_code)
             try:
-                error_content = response.json() if response.content else {}
+                # Only parse the body when the server actually sent JSON
+                if 'application/json' in response.headers.get('Content-Type', ''):
+                    error_content = response.json()
+                else:
+                    error_content = {}
                 error_detail = error_content.get(
                     'message', f"Kode status: {response.status_code}")
-            except:
+            except (ValueError, AttributeError):
                 error_detail = f"Kode status: {response.status_code}"
 
             error_msg = f"⚠️ Server Error: {error_detail}"
             return None, error_msg
 
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         error_msg = f"⚠️ Terjadi kesalahan: {str(e)}"
         return None, error_msg
 
@@ -442,11 +505,9 @@ def recording_state(recording=False):
     else:
         return gr.update(visible=False), gr.update(visible=True)
 
-# Create wave animation HTML
-
 
-def get_wave_animation():
-    return """
+# Wave animation HTML, built once at import
+_WAVE_HTML = """
     <div class="wave-container">
         <div class="wave">
             <div class="wave-bar"></div>
@@ -461,6 +522,10 @@ def get_wave_animation():
     """
 
 
+def get_wave_animation():
+    return _WAVE_HTML
+
+
 # UI with Gradio Blocks - Dark Green Bottle Theme
 with gr.Blocks(theme=theme, css=custom_css) as demo:
     # Header with logo
@@ -532,7 +597,7 @@ with gr.Blocks(theme=theme, css=custom_css) as demo:
 
                 # Audio output
                 audio_output = gr.Audio(
-                    type="filepath",
+                    type="numpy",
                     elem_id="voice-output",
                     show_label=False
                 )
@@ -570,9 +635,12 @@ with gr.Blocks(theme=theme, css=custom_css) as demo:
     submit_btn.click(
         fn=voice_chat,
         inputs=[audio_input],
-        outputs=[audio_output, status_msg]
+        outputs=[audio_output, status_msg],
+        concurrency_limit=CONCURRENCY_LIMIT
     )
 
+    demo.queue(max_size=32)
+
 # Launch the app
 if __name__ == "__main__":
     logger.info("Starting Voice Chatbot Frontend with Bottle Green Theme")